@@ -1,7 +1,8 @@
 # stndlib
 from __future__ import annotations
+import os
 import shutil
-import subprocess
+import stat
 
 # libraries
 import click
@@ -38,27 +39,27 @@ scoop install cloc               # Windows with Scoop
 @click.option(
     "--fullscreen", "-f", is_flag=True, default=False, help="Run in fullscreen / full terminal mode"
 )
-def cli(path: str | None, fullscreen: bool = False) -> None:
+@click.option(
+    "--processes",
+    "-p",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of CPU cores CLOC should use (passed to CLOC's --processes). "
+    "Requires a CLOC with Parallel::ForkManager.",
+)
+def cli(path: str | None, fullscreen: bool = False, processes: int | None = None) -> None:
     """
     CLOCTUI - a terminal frontend for CLOC (Count Lines of Code).
 
     Path must be provided. Use '.' for the current directory or specify a path to a directory.
     """
 
-    # Use shutil.which to check if cloc is in PATH
+    # Use shutil.which to check if cloc is in PATH. This only returns a path for
+    # an executable file, so there's no need to also spawn `cloc --version`.
     if shutil.which("cloc") is None:
         click.echo(error_message)
         return
 
-    # Check if cloc command is available by running it
-    try:
-        subprocess.run(
-            ["cloc", "--version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        click.echo(error_message)
-        return
-
     # After confirming the user has CLOC installed, proceed with checking the path
     # If no main argument is provided, do nothing
     if path is None:
@@ -69,18 +70,26 @@ def cli(path: str | None, fullscreen: bool = False) -> None:
         return
 
     else:
-        from pathlib import Path
-        from cloctui.main import ClocTUI
-
-        path_obj = Path(path).expanduser().resolve()
-        if not path_obj.exists():
+        # CLOC is not run through a shell, so expand the user directory here.
+        # The path doesn't need resolving, CLOC handles symlinks and relative
+        # paths itself.
+        dir_to_scan = os.path.expanduser(path)
+
+        # A single stat call answers both questions (exists and is a directory).
+        try:
+            path_stat = os.stat(dir_to_scan)
+        except OSError:
             click.echo(f"Path '{path}' does not exist.")
             return
-        
-        if not path_obj.is_dir():
+
+        if not stat.S_ISDIR(path_stat.st_mode):
             click.echo(f"Path '{path}' is not a directory.")
             return
 
+        # Importing the app pulls in all of Textual and Rich, so it's only done
+        # once the path is known to be valid. The error paths above stay fast.
+        from cloctui.main import ClocTUI
+
         inline = not fullscreen
 
         if fullscreen:
@@ -88,7 +97,7 @@ def cli(path: str | None, fullscreen: bool = False) -> None:
         else:
             mode = ClocTUI.AppMode.INLINE
 
-        ClocTUI(path, mode=mode).run(inline=inline, inline_no_clear=True)
+        ClocTUI(dir_to_scan, mode=mode, processes=processes).run(inline=inline, inline_no_clear=True)
 
 
 def run() -> None:
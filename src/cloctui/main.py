@@ -8,13 +8,16 @@
 
 # python standard lib
 from __future__ import annotations
-from typing import TypedDict, Union, cast, Any
+from typing import ClassVar, TypedDict, Union, cast, Any
+import asyncio
 import subprocess
 import os
-import json
-from pathlib import Path
+import sys
 from enum import Enum
+from collections import defaultdict
 from functools import partial
+from operator import itemgetter
+from itertools import product
 
 # Textual imports
 from textual import on, work, events
@@ -27,11 +30,25 @@ from textual.screen import Screen
 from textual.message import Message
 from textual.containers import Horizontal, Vertical
 from textual.binding import Binding
+from textual.timer import Timer
 from rich.text import Text
 
 # Local imports
 from cloctui.spinner import SpinnerWidget
 
+# orjson is optional. It parses large CLOC outputs several times faster than the
+# standard library, and both accept the raw bytes from the CLOC process.
+# json_loads is assigned rather than imported under a new name, so that it's
+# exported from this module (rawoutput.py uses the same parser).
+try:
+    import orjson  # type: ignore[import-not-found, unused-ignore]
+
+    json_loads = orjson.loads
+except ImportError:
+    import json
+
+    json_loads = json.loads  # type: ignore[assignment, unused-ignore]
+
 
 class CLOCException(Exception):
 
@@ -45,6 +62,7 @@ class ClocFileStats(TypedDict):
     comment: int
     code: int
     language: str
+    total: int  # not part of CLOC's output, added once when parsing
 
 
 class ClocSummaryStats(TypedDict):
@@ -52,6 +70,7 @@ class ClocSummaryStats(TypedDict):
     comment: int
     code: int
     nFiles: int
+    total: int  # not part of CLOC's output, added once when parsing
 
 
 class ClocHeader(TypedDict):
@@ -70,23 +89,39 @@ ClocJsonResult = dict[str, Union[ClocFileStats, ClocSummaryStats, ClocHeader]]
 class SortableText(Text):
 
     def __lt__(self, other: object) -> bool:
-        if isinstance(other, str):
-            return self.plain < other
+        # Sorting the path column compares two SortableTexts, so that case is
+        # checked first. (Text.plain is cheap, it's the joined text string.)
         if isinstance(other, Text):
             return self.plain < other.plain
+        if isinstance(other, str):
+            return self.plain < other
         return NotImplemented
 
 
+# One table row: path (or language / dir), language, blank, comment, code, total
+TableRow = tuple[SortableText, str, int, int, int, int]
+
+
 # This class courtesey of Stefano Stone
 # https://github.com/USIREVEAL/pycloc
 # Modified by Edward Jazzhands (added all type hints and improved docstrings)
 class CLOC:
+
+    # CLOC's own exit codes with a known meaning. Anything else is reported as
+    # unknown. CLOC isn't run through a shell, so there are no shell exit codes
+    # like 126/127 to handle here. Failing to start CLOC at all is handled by
+    # exception_from_os_error instead.
+    ERROR_MESSAGES: ClassVar[dict[int, str]] = {
+        25: "Failed to create tarfile of files from git or not a git repository.",
+    }
+
     def __init__(self) -> None:
         self.base_command = "cloc"
         self.options: list[str] = []
         self.flags: list[str] = []
         self.arguments: list[str] = []
         self.working_directory = os.getcwd()
+        self.command: list[str] | None = None  # built by build(), reset whenever it changes
 
     def add_option(self, option: str, value: int) -> CLOC:
         """Adds an option with a value (e.g., --output file.txt).
@@ -95,7 +130,8 @@ class CLOC:
             option (str): The option name (e.g., --timeout).
             value (int): The value for the option (e.g., 30).
         """
-        self.options.append(f"{option} {value}")
+        self.options.extend([option, str(value)])
+        self.command = None
         return self
 
     def add_flag(self, flag: str) -> CLOC:
@@ -105,6 +141,7 @@ class CLOC:
             flag (str): The flag to add.
         """
         self.flags.append(flag)
+        self.command = None
         return self
 
     def add_argument(self, argument: str) -> CLOC:
@@ -114,6 +151,7 @@ class CLOC:
             argument (str): The argument to add.
         """
         self.arguments.append(argument)
+        self.command = None
         return self
 
     def set_working_directory(self, path: str) -> CLOC:
@@ -125,42 +163,105 @@ class CLOC:
         self.working_directory = path
         return self
 
-    def build(self) -> str:
-        """Constructs the full CLI command string.
+    def build(self) -> list[str]:
+        """Constructs the full CLI command as an argument list.
 
         Returns:
-            str: The complete command string.
+            list[str]: The command and all of its arguments, ready to be passed to subprocess.
         """
-        parts = [self.base_command] + self.flags + self.options + self.arguments
-        return " ".join(parts)
+        if self.command is None:
+            self.command = [self.base_command, *self.flags, *self.options, *self.arguments]
+        return self.command
 
-    def execute(self) -> str:
+    def execute(self) -> bytes:
         """Executes the CLI command, returns raw process result or Exception.
 
+        The command is run directly (no shell), so paths containing spaces or
+        shell metacharacters are passed through to CLOC untouched.
+
         Returns:
-            str: The output of the command.
+            bytes: The raw output of the command. JSON parsers accept this directly,
+                so it is not decoded to a string first.
         """
         command = self.build()
         try:
+            # stderr is captured so it can't print over the TUI. With --quiet that
+            # leaves only CLOC's error messages, which are added to the exception.
             process = subprocess.run(
-                command, shell=True, check=True, stdout=subprocess.PIPE, cwd=self.working_directory
+                command,
+                check=True,
+                capture_output=True,
+                cwd=self.working_directory,
             )
-            return process.stdout.decode("utf-8")
+            return process.stdout
+        except OSError as error:
+            raise self.exception_from_os_error(error)
         except subprocess.CalledProcessError as error:
-            match error.returncode:
-                case 25:
-                    message = "Failed to create tarfile of files from git or not a git repository."
-                case 126:
-                    message = "Permission denied. Please check the permissions of the working directory."
-                case 127:
-                    message = "CLOC command not found. Please install CLOC."
-                case _:
-                    message = "Unknown CLOC error: " + str(error)
+            raise self.exception_from_error(error)
+
+    async def execute_async(self) -> bytes:
+        """Executes the CLI command as an asyncio subprocess, returns raw process result or Exception.
+
+        This is the same as `execute`, but it waits on CLOC without blocking the
+        event loop, so it doesn't need a worker thread of its own.
+
+        Returns:
+            bytes: The raw output of the command.
+        """
+        command = self.build()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=self.working_directory,
+            )
+        except OSError as error:
+            raise self.exception_from_os_error(error)
+
+        output, errors = await process.communicate()
+        if process.returncode:
+            raise self.exception_from_error(
+                subprocess.CalledProcessError(process.returncode, command, stderr=errors)
+            )
+        return output
+
+    def exception_from_os_error(self, error: OSError) -> CLOCException:
+        """Maps a failure to start CLOC at all to a CLOCException with a readable message.
+
+        Without a shell there's no exit code when CLOC can't be run, the exec itself
+        fails. The codes used are the ones a shell would have exited with.
+
+        Args:
+            error (OSError): The error raised when starting the process.
+        """
+        # The same errors are raised when the working directory can't be used.
+        if error.filename == self.working_directory:
+            return CLOCException(f"Could not use the working directory: {error}", 126)
+        if isinstance(error, FileNotFoundError):
+            return CLOCException("CLOC command not found. Please install CLOC.", 127)
+        if isinstance(error, PermissionError):
+            return CLOCException("Permission denied. Please check the permissions of CLOC.", 126)
+        return CLOCException(f"Could not run CLOC: {error}", 126)
+
+    def exception_from_error(self, error: subprocess.CalledProcessError) -> CLOCException:
+        """Maps a failed CLOC process to a CLOCException with a readable message.
 
-            if error.returncode < 0 or error.returncode > 128:
-                message = "CLOC command was terminated by signal " + str(-error.returncode)
+        Args:
+            error (subprocess.CalledProcessError): The error for the failed process.
+        """
+        code = error.returncode
+        # A process killed by a signal has a negative return code.
+        if code < 0:
+            message = f"CLOC command was terminated by signal {-code}"
+        else:
+            message = self.ERROR_MESSAGES.get(code, f"Unknown CLOC error: {error}")
 
-            raise CLOCException(message, error.returncode)
+        # Whatever CLOC printed to stderr is usually the actual reason it failed.
+        if error.stderr:
+            message += "\n" + error.stderr.decode("utf-8", errors="replace").strip()
+
+        return CLOCException(message, code)
 
 
 class CustomDataTable(DataTable[Any]):
@@ -172,9 +273,6 @@ class CustomDataTable(DataTable[Any]):
             "The new size for the summary row's first column."
             self.update_mode = update_mode
 
-    class TableInitialized(Message):
-        pass
-
     class SortingStatus(Enum):
         UNSORTED = 0  #     [-] unsorted
         ASCENDING = 1  #    [↑] ascending (reverse = True)
@@ -196,54 +294,89 @@ class CustomDataTable(DataTable[Any]):
     }
     other_cols_total = sum(COL_SIZES.values()) - COL_SIZES["path"]
 
+    SORT_ARROWS: ClassVar[dict[SortingStatus, str]] = {
+        SortingStatus.UNSORTED: "-",
+        SortingStatus.ASCENDING: "↑",
+        SortingStatus.DESCENDING: "↓",
+    }
+    # Every possible header label, parsed from markup once instead of on every sort.
+    SORT_LABELS: ClassVar[dict[tuple[str, SortingStatus], Text]] = {
+        (key, status): Text.from_markup(f"{key} [dark_orange]{arrow}[/]")
+        for key, (status, arrow) in product(COL_SIZES, SORT_ARROWS.items())
+    }
+    # Clicking a header moves its column to the next status. An unsorted column
+    # starts out ascending, and after that it just toggles.
+    SORT_TRANSITIONS: ClassVar[dict[SortingStatus, SortingStatus]] = {
+        SortingStatus.UNSORTED: SortingStatus.ASCENDING,
+        SortingStatus.ASCENDING: SortingStatus.DESCENDING,
+        SortingStatus.DESCENDING: SortingStatus.ASCENDING,
+    }
+
     def __init__(
         self,
         files_data_grouped: dict[str, dict[str, ClocFileStats]],
         group_mode: CustomDataTable.UpdateMode,
+        table_rows: dict[CustomDataTable.UpdateMode, list[TableRow]],
     ) -> None:
         super().__init__(
             zebra_stripes=True,
             show_cursor=False,
             # cursor_type="column",
         )
-        # self.files_data_grouped = files_data_grouped
-        self.files_data = files_data_grouped["no_group"]
-        self.files_by_language = files_data_grouped["files_by_lang"]
-        self.files_by_dir = files_data_grouped["files_by_dir"]
+        # The groupings are built lazily, so only the one for this table's
+        # group mode is guaranteed to exist. Look it up in on_mount.
+        self.files_data_grouped = files_data_grouped
+        # Rows already built by a previous table, shared across every table
+        # in the session (a new table is created every time the group mode changes).
+        self.table_rows = table_rows
         self.initialized = False
+        self.last_width = -1  # width the first column was last sized for
+        self.resize_timer: Timer | None = None
+        self.fixed_cols_width = 0  # width of every column but the first, set in update_table
 
         self.group_mode: CustomDataTable.UpdateMode = group_mode
 
-        self.sort_status: dict[str, CustomDataTable.SortingStatus] = {
-            "path": CustomDataTable.SortingStatus.UNSORTED,
-            "language": CustomDataTable.SortingStatus.UNSORTED,
-            "blank": CustomDataTable.SortingStatus.UNSORTED,
-            "comment": CustomDataTable.SortingStatus.UNSORTED,
-            "code": CustomDataTable.SortingStatus.UNSORTED,
-            "total": CustomDataTable.SortingStatus.UNSORTED,
-        }
-        self.add_column("path [dark_orange]-[/]", key="path")
-        self.add_column("language [dark_orange]-[/]", width=self.COL_SIZES["language"], key="language")
-        self.add_column("blank [dark_orange]-[/]", width=self.COL_SIZES["blank"], key="blank")
-        self.add_column("comment [dark_orange]-[/]", width=self.COL_SIZES["comment"], key="comment")
-        self.add_column("code [dark_orange]-[/]", width=self.COL_SIZES["code"], key="code")
-        self.add_column("total [dark_orange]-[/]", width=self.COL_SIZES["total"], key="total")
+        # Sort state is per table instance. Only one column is sorted at a time,
+        # so it's enough to track which one it is and in what direction.
+        # The data is handed over already sorted by total, largest first (done in
+        # the worker threads, see ClocTUI.parse_cloc_output), so that's the
+        # state every table starts out in.
+        unsorted = CustomDataTable.SortingStatus.UNSORTED
+        self.sorted_column: str = "total"
+        self.sort_status: CustomDataTable.SortingStatus = CustomDataTable.SortingStatus.ASCENDING
+        self.add_column(self.SORT_LABELS["path", unsorted], key="path")
+        for key in ("language", "blank", "comment", "code", "total"):
+            status = self.sort_status if key == self.sorted_column else unsorted
+            self.add_column(self.SORT_LABELS[key, status], width=self.COL_SIZES[key], key=key)
 
     def on_mount(self) -> None:
 
         if self.group_mode == CustomDataTable.UpdateMode.NO_GROUP:
-            self.update_table(self.files_data, CustomDataTable.UpdateMode.NO_GROUP)
+            self.update_table(self.files_data_grouped["no_group"], CustomDataTable.UpdateMode.NO_GROUP)
         elif self.group_mode == CustomDataTable.UpdateMode.GROUP_BY_LANG:
-            self.update_table(self.files_by_language, CustomDataTable.UpdateMode.GROUP_BY_LANG)
+            self.update_table(
+                self.files_data_grouped["files_by_lang"], CustomDataTable.UpdateMode.GROUP_BY_LANG
+            )
         elif self.group_mode == CustomDataTable.UpdateMode.GROUP_BY_DIR:
-            self.update_table(self.files_by_dir, CustomDataTable.UpdateMode.GROUP_BY_DIR)
+            self.update_table(
+                self.files_data_grouped["files_by_dir"], CustomDataTable.UpdateMode.GROUP_BY_DIR
+            )
         else:
             raise RuntimeError(f"Invalid group mode {self.group_mode}")
 
     def on_resize(self) -> None:
         self.log("on_resize called in table")
-        if self.initialized and self.group_mode:
-            self.calculate_first_column_size(self.group_mode)
+        # Only the width affects the column sizes. Height changes (and repeated
+        # events for the same size) don't need the columns recalculated.
+        if self.initialized and self.group_mode and self.size.width != self.last_width:
+            # Dragging the terminal edge sends a burst of resize events. Restarting
+            # the timer on each one means the columns are only resized once the
+            # size settles, instead of once per event.
+            if self.resize_timer is not None:
+                self.resize_timer.stop()
+            self.resize_timer = self.set_timer(
+                0.05, partial(self.calculate_first_column_size, self.group_mode)
+            )
 
     def update_table(
         self,
@@ -251,41 +384,66 @@ class CustomDataTable(DataTable[Any]):
         update_mode: CustomDataTable.UpdateMode,
     ) -> None:
 
-        for key, data in file_data.items():
+        # The rows for each mode are only built once. Switching back to a mode
+        # that was already shown reuses them (Rich Text cells are never modified
+        # by the DataTable, so sharing them between tables is safe).
+        rows = self.table_rows.get(update_mode)
+        if rows is None:
+            rows = self.table_rows[update_mode] = self.build_rows(file_data, update_mode)
 
-            path_obj = Path(key)  # path object simplifies the file checking
-            rich_textized = SortableText(key, overflow="ellipsis")
-            if path_obj.is_file():
-                # This will colorize the file extension in orange, if there is one
-                ext_index = key.rindex(path_obj.suffix) if path_obj.suffix else None
-                if ext_index is not None:
-                    rich_textized.stylize(style="dark_orange", start=ext_index)
-
-            self.add_row(
-                rich_textized,
-                data["language"],
-                data["blank"],
-                data["comment"],
-                data["code"],
-                data["blank"] + data["comment"] + data["code"],
-            )
+        # Insert all the rows in one batch rather than one add_row call per file,
+        # and hold off repaints until they are all in.
+        with self.app.batch_update():
+            self.add_rows(rows)
 
         if update_mode == CustomDataTable.UpdateMode.GROUP_BY_LANG:
             self.remove_column(ColumnKey("path"))
-            self.sort_status.pop("path", None)
         elif update_mode == CustomDataTable.UpdateMode.GROUP_BY_DIR:
             self.remove_column(ColumnKey("language"))
-            self.sort_status.pop("language", None)
+
+        # The columns don't change after this, so the width taken up by everything
+        # except the first column is worked out once here instead of on every resize.
+        # Account for padding on both sides of each column:
+        total_cell_padding = (self.cell_padding * 2) * len(self.columns)
+        self.fixed_cols_width = self.other_cols_total + total_cell_padding
 
         self.call_after_refresh(self.calculate_first_column_size, update_mode=update_mode)
 
+    def build_rows(
+        self, file_data: dict[str, ClocFileStats], update_mode: CustomDataTable.UpdateMode
+    ) -> list[TableRow]:
+
+        # Only the ungrouped view shows file paths. The keys in the other views
+        # are languages or directories, which never get an extension colored.
+        # (Every key in the ungrouped view is a file CLOC counted, so there's
+        # no need to stat it on disk to find that out.)
+        colorize_ext = update_mode == CustomDataTable.UpdateMode.NO_GROUP
+        sep = os.sep
+        # Fetches the rest of the row in one call, in column order.
+        row_stats = itemgetter("language", "blank", "comment", "code", "total")
+
+        rows: list[TableRow] = []
+        for key, data in file_data.items():
+
+            rich_textized = SortableText(key, overflow="ellipsis")
+            if colorize_ext:
+                # This will colorize the file extension in orange, if there is one.
+                # Same rules as Path.suffix: the last dot in the file name, but not
+                # a leading dot (.gitignore) or a trailing one.
+                name_start = max(key.rfind("/"), key.rfind(sep)) + 1
+                ext_index = key.rfind(".", name_start)
+                if name_start < ext_index < len(key) - 1:
+                    rich_textized.stylize(style="dark_orange", start=ext_index)
+
+            rows.append((rich_textized, *row_stats(data)))
+        return rows
+
     def calculate_first_column_size(self, update_mode: CustomDataTable.UpdateMode) -> None:
 
-        # Account for padding on both sides of each column:
-        total_cell_padding = (self.cell_padding * 2) * len(self.columns)
+        self.last_width = self.size.width
 
         # Pretty obvious how this works I think:
-        first_col_max_width = self.size.width - self.other_cols_total - total_cell_padding
+        first_col_max_width = self.size.width - self.fixed_cols_width
 
         if (
             update_mode == CustomDataTable.UpdateMode.NO_GROUP
@@ -323,14 +481,15 @@ class CustomDataTable(DataTable[Any]):
                 )
             )
 
+        # custom_refresh does the one repaint for the new column widths, there's
+        # no need for another one here as well.
         self.call_after_refresh(self.custom_refresh)
-        self.refresh()
 
     def custom_refresh(self) -> None:
         self.refresh()
-        if not self.initialized:
-            self.initialized = True
-            self.post_message(CustomDataTable.TableInitialized())
+        # The first pass of sizing the columns is done, from here on
+        # on_resize takes care of it.
+        self.initialized = True
 
     @on(DataTable.HeaderSelected)
     def header_selected(self, event: DataTable.HeaderSelected) -> None:
@@ -342,40 +501,26 @@ class CustomDataTable(DataTable[Any]):
 
         if column_key.value is None:
             raise ValueError("Tried to sort a column with no key.")
-        if column_key.value not in self.sort_status:
+        if column_key not in self.columns:
             raise ValueError(
                 f"Unknown column key: {column_key.value}. "
                 "This should never happen, please report this issue."
             )
         value = column_key.value
 
-        # if its currently unsorted, that means the user is switching columns
-        # to sort. Reset all columns to unsorted.
-        if self.sort_status[value] == self.SortingStatus.UNSORTED:
-            for key in self.sort_status:
-                self.sort_status[key] = self.SortingStatus.UNSORTED
-                col_index = self.get_column_index(key)
-                col = self.ordered_columns[col_index]
-                col.label = Text.from_markup(f"{key} [dark_orange]-[/]")
-
-            # Now set chosen column to ascending:
-            self.sort_status[value] = self.SortingStatus.ASCENDING
-            self.sort(column_key, reverse=True)
-            column.label = Text.from_markup(f"{value} [dark_orange]↑[/]")
-
-        # For the other two conditions, we just toggle ascending/descending
-        elif self.sort_status[value] == self.SortingStatus.ASCENDING:
-            self.sort_status[value] = self.SortingStatus.DESCENDING
-            self.sort(value, reverse=False)
-            column.label = Text.from_markup(f"{value} [dark_orange]↓[/]")
-        elif self.sort_status[value] == self.SortingStatus.DESCENDING:
-            self.sort_status[value] = self.SortingStatus.ASCENDING
-            self.sort(column_key, reverse=True)
-            column.label = Text.from_markup(f"{value} [dark_orange]↑[/]")
-        else:
-            raise ValueError(
-                f"Sort status for {value} is '{self.sort_status[value]}', did not meet any expected values."
-            )
+        # if it's a different column than the one currently sorted, that means
+        # the user is switching columns to sort. Only the previously sorted
+        # column needs its label reset, all the others are already unsorted.
+        if value != self.sorted_column:
+            self.columns[ColumnKey(self.sorted_column)].label = self.SORT_LABELS[
+                self.sorted_column, self.SortingStatus.UNSORTED
+            ]
+            self.sorted_column = value
+            self.sort_status = self.SortingStatus.UNSORTED
+
+        self.sort_status = self.SORT_TRANSITIONS[self.sort_status]
+        self.sort(column_key, reverse=self.sort_status == self.SortingStatus.ASCENDING)
+        column.label = self.SORT_LABELS[value, self.sort_status]
 
 
 class HeaderBar(Static):
@@ -388,8 +533,7 @@ class HeaderBar(Static):
     def on_mount(self) -> None:
         self.update_header(self.header_data)
 
-    @work(description="Updating header with CLOC version and elapsed time")
-    async def update_header(self, header_data: ClocHeader) -> None:
+    def update_header(self, header_data: ClocHeader) -> None:
         """Updates the header with CLOC version and elapsed time."""
         inline_msg = ""
         if self.app.is_inline:
@@ -407,6 +551,22 @@ class HeaderBar(Static):
 class SummaryBar(Horizontal):
     """A horizontal bar to display summary statistics."""
 
+    # The cell widths are generated from COL_SIZES, so that the COL_SIZES dictionary
+    # stays the one source of truth for the column widths, but Textual can still
+    # apply them in the stylesheet pass. The +2s here are all to account for the
+    # padding on both sides of each column. sum_label isn't set because it has a
+    # width of 1fr in styles.tcss.
+    DEFAULT_CSS = "\n".join(
+        f"SummaryBar > #sum_{cell} {{ width: {CustomDataTable.COL_SIZES[column] + 2}; }}"
+        for cell, column in (
+            ("files", "language"),
+            ("blank", "blank"),
+            ("comment", "comment"),
+            ("code", "code"),
+            ("total", "total"),
+        )
+    )
+
     def __init__(self, summary_data: ClocSummaryStats) -> None:
         """Initializes the SummaryBar with CLOC summary statistics."""
         super().__init__()
@@ -414,54 +574,46 @@ class SummaryBar(Horizontal):
 
     def compose(self) -> ComposeResult:
         """Compose the summary bar with static text."""
-        yield Static("SUM:  ", id="sum_label", classes="sum_cell")
-        yield Static(id="sum_files", classes="sum_cell")
-        yield Static(id="sum_blank", classes="sum_cell")
-        yield Static(id="sum_comment", classes="sum_cell")
-        yield Static(id="sum_code", classes="sum_cell")
-        yield Static(id="sum_total", classes="sum_cell")
+        # References to the cells are kept so that updating them later doesn't
+        # need a query_one DOM walk for every cell.
+        self.sum_label = Static("SUM:  ", id="sum_label", classes="sum_cell")
+        self.sum_files = Static(id="sum_files", classes="sum_cell")
+        self.sum_blank = Static(id="sum_blank", classes="sum_cell")
+        self.sum_comment = Static(id="sum_comment", classes="sum_cell")
+        self.sum_code = Static(id="sum_code", classes="sum_cell")
+        self.sum_total = Static(id="sum_total", classes="sum_cell")
+        yield self.sum_label
+        yield self.sum_files
+        yield self.sum_blank
+        yield self.sum_comment
+        yield self.sum_code
+        yield self.sum_total
         yield Static(id="sum_filler", classes="sum_cell")
 
     def on_mount(self) -> None:
-        # The +2s here are all to account for the padding on both sides of each column.
-        # I dont set sum_label because it has a width of 1fr in Textual.
-
-        # I didn't use CSS for this because I want the COL_SIZES dictionary to be
-        # the one source of truth for the column widths.
-        self.query_one("#sum_files").styles.width = CustomDataTable.COL_SIZES["language"] + 2
-        self.query_one("#sum_blank").styles.width = CustomDataTable.COL_SIZES["blank"] + 2
-        self.query_one("#sum_comment").styles.width = CustomDataTable.COL_SIZES["comment"] + 2
-        self.query_one("#sum_code").styles.width = CustomDataTable.COL_SIZES["code"] + 2
-        self.query_one("#sum_total").styles.width = CustomDataTable.COL_SIZES["total"] + 2
-
         self.update_summary(self.summary_data)
 
-    @work(description="Updating summary statistics")
-    async def update_summary(self, summary_data: ClocSummaryStats) -> None:
+    def update_summary(self, summary_data: ClocSummaryStats) -> None:
 
-        self.query_one("#sum_files", Static).update(f"{summary_data['nFiles']} files")
-        self.query_one("#sum_blank", Static).update(f"{summary_data['blank']}")
-        self.query_one("#sum_comment", Static).update(f"{summary_data['comment']}")
-        self.query_one("#sum_code", Static).update(f"{summary_data['code']}")
-        self.query_one("#sum_total", Static).update(
-            f"{summary_data['blank'] + summary_data['comment'] + summary_data['code']}"
-        )
+        self.sum_files.update(f"{summary_data['nFiles']} files")
+        self.sum_blank.update(f"{summary_data['blank']}")
+        self.sum_comment.update(f"{summary_data['comment']}")
+        self.sum_code.update(f"{summary_data['code']}")
+        self.sum_total.update(f"{summary_data['total']}")
 
     def update_size(self, message: CustomDataTable.UpdateSummarySize) -> None:
         mode = message.update_mode
         first_col_size = message.size
-        sum_label = self.query_one("#sum_label", Static)
-        files_label = self.query_one("#sum_files", Static)
         if mode == CustomDataTable.UpdateMode.NO_GROUP:
-            sum_label.display = True
-            sum_label.styles.width = first_col_size
-            files_label.styles.width = CustomDataTable.COL_SIZES["language"] + 2
+            self.sum_label.display = True
+            self.sum_label.styles.width = first_col_size
+            self.sum_files.styles.width = CustomDataTable.COL_SIZES["language"] + 2
         elif (
             mode == CustomDataTable.UpdateMode.GROUP_BY_LANG
             or mode == CustomDataTable.UpdateMode.GROUP_BY_DIR
         ):
-            sum_label.display = False
-            files_label.styles.width = first_col_size
+            self.sum_label.display = False
+            self.sum_files.styles.width = first_col_size
 
 
 class OptionsBar(Horizontal):
@@ -515,6 +667,7 @@ class TableScreen(Screen[None]):
         self.header_data = worker_result.header_data
         self.summary_data = worker_result.summary_data
         self.files_data_grouped = worker_result.files_data_grouped
+        self.table_rows = worker_result.table_rows
         self.group_mode = group_mode
         self.ctrl_nums = "1-6" if group_mode == CustomDataTable.UpdateMode.NO_GROUP else "1-5"
 
@@ -524,7 +677,7 @@ class TableScreen(Screen[None]):
             yield HeaderBar(self.header_data)
             yield OptionsBar()
         with Vertical(id="table_container"):
-            self.table = CustomDataTable(self.files_data_grouped, self.group_mode)
+            self.table = CustomDataTable(self.files_data_grouped, self.group_mode, self.table_rows)
             yield self.table
         with Vertical(id="bottom_container"):
             self.summary_bar = SummaryBar(self.summary_data)
@@ -541,16 +694,6 @@ class TableScreen(Screen[None]):
                 if self.app.is_inline:
                     yield Button("Quit without clearing screen", id="quit_no_clear", compact=True)
 
-    @on(CustomDataTable.TableInitialized)
-    async def table_initialized(self) -> None:
-
-        if self.group_mode == CustomDataTable.UpdateMode.NO_GROUP:
-            await self.run_action("sort_column(5)")
-        else:
-            await self.run_action("sort_column(4)")
-
-        # self.app.set_focus(self.query_one(OptionsBar).query_one("#button_no_group"))
-
     def on_resize(self, event: events.Resize) -> None:
         self.log(f"on_resize called in Screen with height: {event.size.height}")
 
@@ -624,14 +767,22 @@ class ClocTUI(App[None]):
             self.header_data = header_data
             self.summary_data = summary_data
             self.files_data_grouped = files_data_grouped
+            self.table_rows: dict[CustomDataTable.UpdateMode, list[TableRow]] = {}
+            "Table rows for each group mode, filled in by the tables as they are shown."
 
-    def __init__(self, dir_to_scan: str, mode: ClocTUI.AppMode) -> None:
+    class NoFilesFound(Message):
+        "Posted instead of WorkerFinished when CLOC didn't count any files."
+
+    def __init__(self, dir_to_scan: str, mode: ClocTUI.AppMode, processes: int | None = None) -> None:
         """
         Args:
             dir_to_scan (str): The directory to scan for CLOC stats.
+            processes (int | None): Number of processes CLOC should use. If None,
+                CLOC's own default is used.
         """
         self.dir_to_scan = dir_to_scan
         self.mode = mode
+        self.processes = processes
 
         if self.mode == ClocTUI.AppMode.INLINE:
             ansi_color = True
@@ -646,98 +797,159 @@ class ClocTUI(App[None]):
             yield SpinnerWidget(spinner_type="simpleDotsScrolling")
 
     def on_mount(self) -> None:
+        # Start CLOC as early as possible. Its startup then overlaps with the
+        # first layout and paint of the app instead of waiting for on_ready.
+        self.execute_cloc()
+
         if self.is_inline:
             self.query_one("#spinner_container").add_class("inline")
         else:
             self.query_one("#spinner_container").add_class("fullscreen")
 
-    def on_ready(self) -> None:
-        self.execute_cloc()
-
     async def action_quit(self) -> None:
         # this forces it to clear when exiting:
         self._exit_renderables.append("")
         self.exit()
 
-    @work(description="Executing CLOC command", thread=True)
-    def execute_cloc(self) -> None:
-        """Executes the CLOC command and returns the parsed JSON result."""
+    @work(description="Executing CLOC command")
+    async def execute_cloc(self) -> None:
+        """Executes the CLOC command and posts the parsed result.
+
+        CLOC runs as an asyncio subprocess, so no thread is tied up waiting for
+        it. Parsing and grouping the output is CPU bound, so that part is still
+        handed off to a thread to keep the spinner animating on large outputs."""
 
         cloc = (
             CLOC()
             .add_flag("--by-file")
             .add_flag("--json")
+            .add_flag("--quiet")
             .add_option("--timeout", self.timeout)
             .set_working_directory(self.working_directory)
             .add_argument(self.dir_to_scan)
         )
+        # Only passed when asked for. CLOC exits with an error if --processes is
+        # given but Parallel::ForkManager isn't installed.
+        if self.processes is not None:
+            cloc.add_option("--processes", self.processes)
 
         try:
-            output = cloc.execute()
+            output = await cloc.execute_async()
         except CLOCException as e:
             raise e
 
-        result: ClocJsonResult = json.loads(output)
+        # CLOC prints nothing at all when it didn't find any files to count.
+        if not output.strip():
+            self.post_message(ClocTUI.NoFilesFound())
+            return
 
-        # The header and summary data will come out ready to use and don't
-        # require further processing.
-        header_data: ClocHeader = cast(ClocHeader, result["header"])
-        summary_data: ClocSummaryStats = cast(ClocSummaryStats, result["SUM"])
-
-        # The files data needs to be processed to group by language and directory.
-        files_data: dict[str, ClocFileStats] = {}
-        files_by_language: dict[str, ClocFileStats] = {}
-        files_by_dir: dict[str, ClocFileStats] = {}
-
-        # First separate out the files data from the result.
-        for key, value in result.items():
-            if key in ["header", "SUM"]:
-                continue
-            else:
-                files_data[key] = cast(ClocFileStats, value)
-
-        for key, data in files_data.items():
-            # Group by language
-            if data["language"] not in files_by_language:
-                files_by_language[data["language"]] = {
-                    "blank": 0,
-                    "comment": 0,
-                    "code": 0,
-                    "language": data["language"],
-                }
-            files_by_language[data["language"]]["blank"] += data["blank"]
-            files_by_language[data["language"]]["comment"] += data["comment"]
-            files_by_language[data["language"]]["code"] += data["code"]
-
-            # Group by directory
-            dir_name = os.path.dirname(key)
-            if dir_name not in files_by_dir:
-                files_by_dir[dir_name] = {
-                    "blank": 0,
-                    "comment": 0,
-                    "code": 0,
-                    "language": dir_name,
-                }
-            files_by_dir[dir_name]["blank"] += data["blank"]
-            files_by_dir[dir_name]["comment"] += data["comment"]
-            files_by_dir[dir_name]["code"] += data["code"]
-
-        files_by_language = files_by_language
-        files_by_dir = files_by_dir
-
-        files_data_grouped = {
-            "no_group": files_data,
-            "files_by_lang": files_by_language,
-            "files_by_dir": files_by_dir,
-        }
+        self.worker_finished_msg = await asyncio.to_thread(self.parse_cloc_output, output)
+        if not self.worker_finished_msg.files_data_grouped["no_group"]:
+            self.post_message(ClocTUI.NoFilesFound())
+            return
+        self.post_message(self.worker_finished_msg)
+
+    def parse_cloc_output(self, output: bytes) -> ClocTUI.WorkerFinished:
+        """Parses the raw JSON output of CLOC.
+
+        Only the files data needed for the first screen is prepared here. The
+        language and directory groupings are built by `group_files_data` the
+        first time the user switches to one of them.
 
-        self.worker_finished_msg = ClocTUI.WorkerFinished(
+        Args:
+            output (bytes): The raw output of `cloc --by-file --json`.
+        """
+
+        result: ClocJsonResult = json_loads(output)
+
+        # The header and summary data will come out ready to use and don't
+        # require further processing. Popping them out of the result leaves
+        # only the files data behind, so the result dict can be used as is
+        # instead of being copied into a new one.
+        header_data: ClocHeader = cast(ClocHeader, result.pop("header"))
+        summary_data: ClocSummaryStats = cast(ClocSummaryStats, result.pop("SUM"))
+        files_data = cast(dict[str, ClocFileStats], result)
+        summary_data["total"] = summary_data["blank"] + summary_data["comment"] + summary_data["code"]
+
+        intern = sys.intern
+        for data in files_data.values():
+            # Every file gets its own language string from the JSON parser, even though
+            # there are only a handful of distinct languages. Interning them shares
+            # one object per language, and makes the bucket lookups compare by identity.
+            data["language"] = intern(data["language"])
+            # The total is stored once here so the table never has to
+            # add it up again when rows are built.
+            data["total"] = data["blank"] + data["comment"] + data["code"]
+
+        # The table starts out sorted by total, largest first. Sorting here, while
+        # still in the worker thread, means the table doesn't have to sort and
+        # redraw itself right after it's shown. (Python's sort is stable, so ties
+        # keep CLOC's order, the same as DataTable.sort would give.)
+        files_data = dict(sorted(files_data.items(), key=lambda item: item[1]["total"], reverse=True))
+
+        return ClocTUI.WorkerFinished(
             header_data=header_data,
             summary_data=summary_data,
-            files_data_grouped=files_data_grouped,
+            files_data_grouped={"no_group": files_data},
         )
 
-        self.post_message(self.worker_finished_msg)
+    def group_files_data(self) -> None:
+        """Groups the files data by language and by directory, if that hasn't been done yet.
+
+        Both groupings are built together in one pass, and are kept for the rest
+        of the session. Users who never leave the files view never pay for them.
+        This loops over every file, so it's run in a thread the same as
+        `parse_cloc_output`, rather than on the event loop."""
+
+        files_data_grouped = self.worker_finished_msg.files_data_grouped
+        if "files_by_lang" in files_data_grouped:
+            return
+
+        # The counts are accumulated in plain lists of [blank, comment, code, total],
+        # which are cheaper to update than dicts. The ClocFileStats for each
+        # group are only built once at the end, one per language / directory.
+        lang_counts: defaultdict[str, list[int]] = defaultdict(lambda: [0, 0, 0, 0])
+        dir_counts: defaultdict[str, list[int]] = defaultdict(lambda: [0, 0, 0, 0])
+
+        dirname = os.path.dirname
+        for key, data in files_data_grouped["no_group"].items():
+            blank = data["blank"]
+            comment = data["comment"]
+            code = data["code"]
+            total = data["total"]
+
+            counts = lang_counts[data["language"]]
+            counts[0] += blank
+            counts[1] += comment
+            counts[2] += code
+            counts[3] += total
+
+            counts = dir_counts[dirname(key)]
+            counts[0] += blank
+            counts[1] += comment
+            counts[2] += code
+            counts[3] += total
+
+        # Built in order of total, largest first, for the same reason as in
+        # parse_cloc_output (the tables start out sorted that way).
+        def by_total(item: tuple[str, list[int]]) -> int:
+            return item[1][3]
+
+        files_by_language: dict[str, ClocFileStats] = {
+            language: {"blank": blank, "comment": comment, "code": code, "language": language, "total": total}
+            for language, (blank, comment, code, total) in sorted(
+                lang_counts.items(), key=by_total, reverse=True
+            )
+        }
+        files_by_dir: dict[str, ClocFileStats] = {
+            dir_name: {"blank": blank, "comment": comment, "code": code, "language": dir_name, "total": total}
+            for dir_name, (blank, comment, code, total) in sorted(
+                dir_counts.items(), key=by_total, reverse=True
+            )
+        }
+
+        files_data_grouped["files_by_lang"] = files_by_language
+        files_data_grouped["files_by_dir"] = files_by_dir
 
     @on(WorkerFinished)
     async def worker_finished(self, message: WorkerFinished) -> None:
@@ -748,11 +960,28 @@ class ClocTUI(App[None]):
             TableScreen(message, group_mode=CustomDataTable.UpdateMode.NO_GROUP),
         )
 
+    @on(NoFilesFound)
+    async def no_files_found(self) -> None:
+
+        spinner_container = self.query_one("#spinner_container", Horizontal)
+        await spinner_container.remove_children()
+        await spinner_container.mount_all(
+            [
+                Static("No files counted.", id="no_files_label"),
+                Horizontal(Button("Quit", id="no_files_quit", compact=True), classes="button_container"),
+            ]
+        )
+
+    @on(Button.Pressed, "#no_files_quit")
+    async def no_files_quit_pressed(self) -> None:
+        await self.action_quit()
+
     @on(OptionsBar.GroupByLang)
     async def group_by_lang(self) -> None:
 
         table_screen = self.screen
         assert isinstance(table_screen, TableScreen), "Expected TableScreen instance."
+        await asyncio.to_thread(self.group_files_data)
         table_screen.dismiss()
         await self.push_screen(
             TableScreen(self.worker_finished_msg, group_mode=CustomDataTable.UpdateMode.GROUP_BY_LANG),
@@ -763,6 +992,7 @@ class ClocTUI(App[None]):
 
         table_screen = self.screen
         assert isinstance(table_screen, TableScreen), "Expected TableScreen instance."
+        await asyncio.to_thread(self.group_files_data)
         table_screen.dismiss()
         await self.push_screen(
             TableScreen(self.worker_finished_msg, group_mode=CustomDataTable.UpdateMode.GROUP_BY_DIR),
@@ -2,7 +2,7 @@
 # For testing and debugging purposes
 
 import json
-from cloctui.main import CLOC, ClocJsonResult
+from cloctui.main import CLOC, ClocJsonResult, json_loads  # same parser as the app
 
 if __name__ == "__main__":
 
@@ -10,7 +10,7 @@ if __name__ == "__main__":
     working_directory = "./"
     dir_to_scan = "src"
 
-    result: ClocJsonResult = json.loads(
+    result: ClocJsonResult = json_loads(
         CLOC()
         .add_flag("--by-file")
         .add_flag("--json")